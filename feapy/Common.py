@@ -1,5 +1,6 @@
 import os
 import re
+import jinja2
 
 
 def get_files_by_extension(working_directory, extension):
@@ -23,6 +24,43 @@ def get_files_by_extension(working_directory, extension):
     return files
 
 
+def get_vtu_files(working_directory, suffix=""):
+    """
+    Get vtu output files of FEAP from directory
+
+    Only files named P<name><5 digit id><suffix>.vtu are returned, e.g. with
+    suffix "_refactored" only the files written by refactoring. The default
+    returns the raw FEAP output.
+
+    Returns a list of FileData objects
+    """
+    regex = re.compile(f"^P.*?([0-9]{{5}}){re.escape(suffix)}\\.vtu$")
+    files = []
+    for file in os.listdir(working_directory):
+        match = re.match(regex, file)
+        if match:
+            files.append(
+                FileData(os.path.join(working_directory, file), int(match.group(1)))
+            )
+    files.sort(key=lambda x: x.path)
+
+    return files
+
+
+def render_template(inputfile, parameters, template_path):
+    """
+    Render FEAP inputfile template with parameters
+
+    Returns rendered inputfile as string
+    """
+    temp_file = inputfile + ".jinja"
+    templateLoader = jinja2.FileSystemLoader(searchpath=template_path)
+    templateEnv = jinja2.Environment(loader=templateLoader)
+    template = templateEnv.get_template(temp_file)
+
+    return template.render(parameters)
+
+
 def remove_old_files(path):
     regex = re.compile("^P[a-zA-Z]*[0-9]{5}\\.vtu")
     for file in os.listdir(path):
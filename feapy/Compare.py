@@ -0,0 +1,246 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from .Common import get_vtu_files
+from .VTUFile import VTUFile
+
+
+def _failed():
+    """
+    Result for fields that are missing or differ in shape
+    """
+    return {
+        "passed": False,
+        "max_abs_error": np.inf,
+        "max_rel_error": np.inf,
+        "entity": -1,
+        "component": -1,
+        "coordinates": None,
+    }
+
+
+def _compare_arrays(a, b, rtol, atol, num_components=1):
+    """
+    Compare two arrays with vectorized tolerance check
+
+    Returns dictionary with result and location of the maximum error
+    """
+    result = _failed()
+    if a.shape != b.shape:
+        return result
+
+    abs_error = np.abs(a - b)
+    abs_error[np.isnan(a) & np.isnan(b)] = 0.0
+    abs_error[np.isnan(abs_error)] = np.inf
+    tolerance = atol + rtol * np.nan_to_num(np.abs(b))
+    result["passed"] = bool(np.all(abs_error <= tolerance))
+    if abs_error.size == 0:
+        result.update(max_abs_error=0.0, max_rel_error=0.0)
+        return result
+
+    index = int(np.argmax(abs_error))
+    result["max_abs_error"] = float(abs_error.flat[index])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["max_rel_error"] = float(
+            np.nanmax(abs_error / np.maximum(np.abs(b), np.finfo(np.float64).tiny))
+        )
+    result["entity"] = index // num_components
+    result["component"] = index % num_components
+
+    return result
+
+
+def _piece_arrays(piece, location):
+    """
+    Get DataArray elements of a piece by name
+    """
+    return {e.get("Name"): e for e in piece.findall(f"{location}/DataArray")}
+
+
+def _compare_timestep(path_a, path_b, timestep, rtol, atol, fail_fast):
+    """
+    Compare all PointData and CellData arrays of a pair of vtu files
+
+    Pieces are paired by their position in the file. Arrays are converted and
+    compared one at a time to keep memory flat.
+    """
+    vtu_a = VTUFile(path_a)
+    vtu_b = VTUFile(path_b)
+    pieces_a = vtu_a.root.findall("*/Piece")
+    pieces_b = vtu_b.root.findall("*/Piece")
+
+    results = []
+    for piece in range(max(len(pieces_a), len(pieces_b))):
+        if piece >= len(pieces_a) or piece >= len(pieces_b):
+            results.append(
+                {
+                    "timestep": timestep,
+                    "piece": piece,
+                    "location": "VTU",
+                    "field": None,
+                    **_failed(),
+                }
+            )
+            if fail_fast:
+                return results
+            continue
+
+        points = None
+        for location in ["PointData", "CellData"]:
+            arrays_a = _piece_arrays(pieces_a[piece], location)
+            arrays_b = _piece_arrays(pieces_b[piece], location)
+            for name in list(arrays_a) + [n for n in arrays_b if n not in arrays_a]:
+                if name in arrays_a and name in arrays_b:
+                    field_a = vtu_a.extract_data([arrays_a[name]])[name]
+                    field_b = vtu_b.extract_data([arrays_b[name]])[name]
+                    result = _compare_arrays(
+                        field_a["Data"],
+                        field_b["Data"],
+                        rtol,
+                        atol,
+                        field_a["NumberOfComponents"],
+                    )
+                else:
+                    result = _failed()
+
+                if location == "PointData" and result["entity"] >= 0:
+                    if points is None:
+                        points = vtu_b.convert_data_to_np(
+                            pieces_b[piece].find("Points/DataArray")
+                        ).reshape(-1, 3)
+                    result["coordinates"] = tuple(points[result["entity"]])
+
+                results.append(
+                    {
+                        "timestep": timestep,
+                        "piece": piece,
+                        "location": location,
+                        "field": name,
+                        **result,
+                    }
+                )
+                if fail_fast and not result["passed"]:
+                    return results
+
+    return results
+
+
+def _compare_tplot(dir_a, dir_b, rtol, atol):
+    """
+    Compare TPLOt output series (.dis, .sum, .str) of two runs
+    """
+    results = []
+    for ext in ["dis", "sum", "str"]:
+        names = {
+            os.path.basename(path)
+            for directory in [dir_a, dir_b]
+            for path in glob.glob(os.path.join(directory, f"P*.{ext}"))
+        }
+        for name in sorted(names):
+            path_a = os.path.join(dir_a, name)
+            path_b = os.path.join(dir_b, name)
+            if os.path.exists(path_a) and os.path.exists(path_b):
+                data_a = pd.read_csv(path_a, sep=r"\s+", header=None)
+                data_b = pd.read_csv(path_b, sep=r"\s+", header=None)
+                result = _compare_arrays(
+                    data_a.to_numpy(dtype=np.float64),
+                    data_b.to_numpy(dtype=np.float64),
+                    rtol,
+                    atol,
+                    data_a.shape[1],
+                )
+            else:
+                result = _failed()
+            results.append(
+                {
+                    "timestep": -1,
+                    "piece": -1,
+                    "location": "TPLOT",
+                    "field": name,
+                    **result,
+                }
+            )
+
+    return results
+
+
+def compare_runs(
+    dir_a,
+    dir_b,
+    rtol=1e-5,
+    atol=1e-8,
+    n_jobs=1,
+    fail_fast=False,
+    refactored=False,
+    dataframe=True,
+):
+    """
+    Compare results of two FEAP runs field by field
+
+    Timesteps are paired by id and pieces by position. TPLOt series and every
+    PointData and CellData array are checked with |a - b| <= atol + rtol * |b|.
+    For every field the maximum error and its location (piece, entity,
+    component and, for point data, reference coordinates) are reported.
+    Timestep pairs are compared in parallel using n_jobs processes. If
+    fail_fast is set, the comparison stops after the first batch containing a
+    failure.
+
+    Returns pandas dataframe with one row per compared field and piece
+    """
+    results = _compare_tplot(dir_a, dir_b, rtol, atol)
+    if fail_fast and not all(r["passed"] for r in results):
+        return _to_table(results, dataframe)
+
+    suffix = "_refactored" if refactored else ""
+
+    def vtu_files(directory):
+        return {file.id: file.path for file in get_vtu_files(directory, suffix)}
+
+    files_a = vtu_files(dir_a)
+    files_b = vtu_files(dir_b)
+    for timestep in sorted(set(files_a) ^ set(files_b)):
+        results.append(
+            {
+                "timestep": timestep,
+                "piece": -1,
+                "location": "VTU",
+                "field": None,
+                **_failed(),
+            }
+        )
+    if fail_fast and not all(r["passed"] for r in results):
+        return _to_table(results, dataframe)
+
+    pairs = [
+        (files_a[timestep], files_b[timestep], timestep)
+        for timestep in sorted(set(files_a) & set(files_b))
+    ]
+    if n_jobs < 0:
+        n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+    batch_size = n_jobs if fail_fast else max(len(pairs), 1)
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for start in range(0, len(pairs), batch_size):
+            batch = parallel(
+                delayed(_compare_timestep)(
+                    path_a, path_b, timestep, rtol, atol, fail_fast
+                )
+                for path_a, path_b, timestep in pairs[start : start + batch_size]
+            )
+            for batch_results in batch:
+                results.extend(batch_results)
+            if fail_fast and not all(r["passed"] for r in results):
+                break
+
+    return _to_table(results, dataframe)
+
+
+def _to_table(results, dataframe):
+    """
+    Convert list of comparison results to dataframe
+    """
+    if dataframe:
+        return pd.DataFrame(results)
+    return results
@@ -1,12 +1,15 @@
 import os
+import resource
 import subprocess
+import time
 import pandas as pd
-import jinja2
 import shutil
 import glob
-from .Common import get_files_by_extension, remove_old_files
+from .Common import get_vtu_files, remove_old_files, render_template
 from .VTUFile import VTUFile
 from .VTURefactorer import VTURefactorer
+from .VTUPreview import VTUPreview, filter_pattern, select_timesteps
+from .OutputParser import OutputParser
 import datetime
 
 
@@ -20,6 +23,48 @@ def directory_exists(directory):
     return True
 
 
+THREAD_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+]
+
+
+def apply_limits(pid, cpus=None, nice=None, memory_limit=None, cpu_time_limit=None):
+    """
+    Limit resources of a running child process
+
+    cpus is a set of core ids, nice is added to the niceness of the current
+    process, memory_limit is given in bytes and cpu_time_limit in seconds.
+    """
+    if cpus is not None:
+        os.sched_setaffinity(pid, cpus)
+    if nice is not None:
+        priority = os.getpriority(os.PRIO_PROCESS, 0) + nice
+        os.setpriority(os.PRIO_PROCESS, pid, priority)
+    if memory_limit is not None:
+        resource.prlimit(pid, resource.RLIMIT_AS, (memory_limit, memory_limit))
+    if cpu_time_limit is not None:
+        seconds = int(cpu_time_limit)
+        resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds))
+
+
+def peak_memory(pid):
+    """
+    Get peak resident set size (VmHWM) of a running process in bytes
+
+    Returns None if the value cannot be read, e.g. if the process has exited.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
 class FEAPy:
     def __init__(self, executable="feap", working_dir=os.getcwd()) -> None:
         self.executable = executable
@@ -84,23 +129,80 @@ class FEAPy:
                 filename = os.path.basename(f)
                 shutil.move(f, os.path.join(archive_dir, filename))
 
-    def run(self, inputfile):
+    def run(
+        self,
+        inputfile,
+        cpus=None,
+        threads=None,
+        nice=None,
+        memory_limit=None,
+        cpu_time_limit=None,
+        poll_interval=0.1,
+    ):
         """
         Run computation using inputfile
 
-        Returns completed process object
+        The child process can be pinned to a set of cores (cpus), restricted to
+        a number of OpenMP/MKL threads, reniced and limited in address space
+        (memory_limit in bytes) and CPU time (cpu_time_limit in seconds).
+
+        Returns completed process object. Its resource_usage attribute holds
+        user and system CPU time in seconds and the maximum resident set size
+        in bytes of the FEAP process. The latter is sampled from /proc every
+        poll_interval seconds, as the value reported by the kernel at exit
+        includes the memory of the calling Python process. Peaks within the
+        last poll_interval before FEAP exits may be missed. It is None if
+        /proc is not available.
         """
         std_out = os.path.join(self.working_dir, "feap_out")
         std_err = os.path.join(self.working_dir, "feap_err")
         args = f"-i{inputfile}"
 
+        env = None
+        if cpus is not None and threads is None:
+            threads = len(cpus)
+        if threads is not None:
+            env = os.environ.copy()
+            for variable in THREAD_VARIABLES:
+                env[variable] = str(threads)
+
         with open(std_out, "w") as out, open(std_err, "w") as err:
-            res = subprocess.run(
+            # Limits are applied after spawning, as preexec_fn is not safe if the
+            # calling process runs threads
+            process = subprocess.Popen(
                 [self.executable, args],
                 stdout=out,
                 stderr=err,
                 cwd=self.working_dir,
+                env=env,
             )
+            try:
+                apply_limits(process.pid, cpus, nice, memory_limit, cpu_time_limit)
+                max_rss = None
+                while True:
+                    rss = peak_memory(process.pid)
+                    if rss is not None:
+                        max_rss = max(rss, max_rss or 0)
+                    pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+                    if pid:
+                        break
+                    time.sleep(poll_interval)
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
+        else:
+            process.returncode = os.WEXITSTATUS(status)
+
+        res = subprocess.CompletedProcess(process.args, process.returncode)
+        res.resource_usage = {
+            "user_time": usage.ru_utime,
+            "system_time": usage.ru_stime,
+            "max_rss": max_rss,
+        }
 
         return res
 
@@ -121,6 +223,19 @@ class FEAPy:
 
         return data
 
+    def read_convergence(self, inputfile, stdout=False):
+        """
+        Read convergence history from FEAP O-file or feap_out
+
+        Returns pandas dataframe with one row per time step
+        """
+        if stdout:
+            path = os.path.join(self.working_dir, "feap_out")
+        else:
+            path = os.path.join(self.working_dir, f"O{inputfile[1:]}")
+
+        return OutputParser(path).read()
+
     def _read_file(self, inputfile, ext, names):
         """
         Read data from single output file
@@ -141,30 +256,68 @@ class FEAPy:
         """
         Create FEAP inputfile from template
         """
-        temp_file = inputfile + ".jinja"
-        templateLoader = jinja2.FileSystemLoader(searchpath=template_path)
-        templateEnv = jinja2.Environment(loader=templateLoader)
-        template = templateEnv.get_template(temp_file)
-
-        output_text = template.render(parameters)
+        output_text = render_template(inputfile, parameters, template_path)
 
         with open(os.path.join(self.working_dir, inputfile), "w") as f:
             f.write(output_text)
 
-    def refactor_vtu(self, refactor_pattern, keep_originals=True):
+    def refactor_vtu(
+        self,
+        refactor_pattern,
+        keep_originals=True,
+        fields=None,
+        stride=1,
+        timesteps=None,
+        float32=False,
+        surface=False,
+        cell_stride=1,
+    ):
         """
         Refactoring vtu files is working directory to match refactor_pattern
+
+        Setting any of fields, stride, timesteps, float32, surface or
+        cell_stride writes a compact preview (*_preview.vtu) instead. It only
+        contains the selected fields of every stride-th timestep (or of the
+        timesteps closest to the requested ids), optionally reduced to every
+        cell_stride-th cell of the surface and stored as Float32. Previews are
+        lossy, so originals are never removed in this mode.
         """
+        if stride < 1 or cell_stride < 1:
+            raise RuntimeError("stride and cell_stride must be at least 1.")
+
+        preview = (
+            fields is not None
+            or stride > 1
+            or timesteps is not None
+            or float32
+            or surface
+            or cell_stride > 1
+        )
+        if preview and not keep_originals:
+            raise RuntimeError(
+                "Original vtu files cannot be removed when writing previews."
+            )
 
-        vtu_file_names = get_files_by_extension(self.working_dir, "vtu")
+        # Skip files written by previous refactoring runs
+        vtu_file_names = get_vtu_files(self.working_dir)
+        if preview:
+            refactor_pattern = filter_pattern(refactor_pattern, fields)
+            selected = select_timesteps(
+                [file_name.id for file_name in vtu_file_names], stride, timesteps
+            )
+            vtu_file_names = [f for f in vtu_file_names if f.id in selected]
 
         for file_name in vtu_file_names:
             vtu_file = VTUFile(file_name.path)
-            refac = VTURefactorer(vtu_file, refactor_pattern)
+            refac = VTURefactorer(vtu_file, refactor_pattern, float32=float32)
             refac.refactor()
 
             filename, file_extension = os.path.splitext(file_name.path)
-            OUTPUTFILE = filename + "_refactored" + file_extension
+            if preview:
+                VTUPreview(vtu_file, fields, float32, surface, cell_stride).apply()
+                OUTPUTFILE = filename + "_preview" + file_extension
+            else:
+                OUTPUTFILE = filename + "_refactored" + file_extension
             vtu_file.export_file(OUTPUTFILE)
 
         if not keep_originals:
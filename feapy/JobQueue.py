@@ -0,0 +1,368 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import threading
+import pandas as pd
+from joblib import Parallel, delayed
+from .Common import render_template
+from .Feapy import FEAPy
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inputfile TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    input_hash TEXT NOT NULL UNIQUE,
+    input_text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL,
+    lease_expires REAL,
+    finished_at REAL,
+    returncode INTEGER,
+    runtime REAL,
+    cpu_time REAL,
+    max_rss INTEGER,
+    output_dir TEXT
+)
+"""
+
+
+def _worker_name():
+    """
+    Unique name of the current worker process
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_alive(pid):
+    """
+    Check if process with pid is running on this host
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    Persistent queue of FEAP computations stored in a SQLite database
+
+    The database is meant to live on a filesystem shared by all nodes. Workers
+    claim jobs in an exclusive transaction, so any number of processes can work
+    on the same queue. Finished jobs are never run again, which allows to
+    resume a campaign after a crash by simply starting new workers.
+
+    Every claimed job holds a lease of lease seconds, which is renewed by the
+    worker while FEAP is running. Jobs whose lease expired, e.g. because their
+    node was killed, are claimed again by any other worker.
+    """
+
+    def __init__(self, database, output_root=None, timeout=60.0, lease=300.0):
+        self.database = os.path.abspath(database)
+        if output_root:
+            self.output_root = os.path.abspath(output_root)
+        else:
+            self.output_root = os.path.dirname(self.database)
+        self.timeout = timeout
+        self.lease = lease
+
+        with self._connect() as connection:
+            connection.execute(_SCHEMA)
+
+    def _connect(self):
+        """
+        Open new connection to database with manual transaction handling
+        """
+        return _Connection(self.database, self.timeout)
+
+    def add(self, inputfile, parameters, template_path=os.getcwd()):
+        """
+        Add computation for rendered inputfile template to queue
+
+        Jobs with identical rendered inputfiles are only added once. Returns id
+        of the new or already existing job.
+        """
+        input_text = render_template(inputfile, parameters, template_path)
+        input_hash = hashlib.sha256(
+            f"{inputfile}\n{input_text}".encode("utf-8")
+        ).hexdigest()
+
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(inputfile, parameters, input_hash, input_text) VALUES (?, ?, ?, ?)",
+                (
+                    inputfile,
+                    json.dumps(parameters, default=str),
+                    input_hash,
+                    input_text,
+                ),
+            )
+            row = connection.execute(
+                "SELECT id FROM jobs WHERE input_hash = ?", (input_hash,)
+            ).fetchone()
+
+        return row[0]
+
+    def claim(self):
+        """
+        Atomically claim the next pending job or a job with expired lease
+
+        Returns dictionary with job data or None if no pending job is left
+        """
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, claimed_at = ?, "
+                "lease_expires = ? WHERE id = ?",
+                (_worker_name(), now, now + self.lease, row["id"]),
+            )
+
+        job = dict(row)
+        job["parameters"] = json.loads(job["parameters"])
+        return job
+
+    def renew(self, job_id):
+        """
+        Extend lease of a running job claimed by this worker
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (time.time() + self.lease, job_id, _worker_name()),
+            )
+
+    def _heartbeat(self, job_id, stop):
+        """
+        Renew lease of job until stop is set
+
+        Failed renewals (e.g. locked database) are retried at a shorter
+        interval, so the lease does not expire while FEAP is running.
+        """
+        interval = self.lease / 3
+        while not stop.wait(interval):
+            try:
+                self.renew(job_id)
+                interval = self.lease / 3
+            except Exception:
+                interval = self.lease / 30
+
+    def complete(
+        self, job_id, returncode, runtime, output_dir, cpu_time=None, max_rss=None
+    ):
+        """
+        Record result of a finished job
+
+        The result is only stored if the job is still claimed by this worker.
+        Returns False if the job has been claimed by another worker meanwhile.
+        """
+        status = "done" if returncode == 0 else "failed"
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, returncode = ?, runtime = ?, "
+                "cpu_time = ?, max_rss = ?, output_dir = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (
+                    status,
+                    returncode,
+                    runtime,
+                    cpu_time,
+                    max_rss,
+                    output_dir,
+                    time.time(),
+                    job_id,
+                    _worker_name(),
+                ),
+            )
+            return cursor.rowcount > 0
+
+    def recover(self):
+        """
+        Reset running jobs of crashed workers to pending
+
+        Jobs of workers on this host are reset if their process does not exist
+        anymore. Jobs on other hosts are reset if their lease expired. Returns
+        number of reset jobs.
+        """
+        hostname = socket.gethostname()
+        now = time.time()
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, worker, lease_expires FROM jobs WHERE status = 'running'"
+            ).fetchall()
+
+            stale = []
+            for row in rows:
+                host, pid = row["worker"].rsplit(":", 1)
+                if host == hostname and not _process_alive(int(pid)):
+                    stale.append(row["id"])
+                elif row["lease_expires"] < now:
+                    stale.append(row["id"])
+
+            connection.executemany(
+                "UPDATE jobs SET status = 'pending', worker = NULL, "
+                "claimed_at = NULL, lease_expires = NULL WHERE id = ?",
+                [(job_id,) for job_id in stale],
+            )
+
+        return len(stale)
+
+    def retry_failed(self):
+        """
+        Reset failed jobs to pending. Returns number of reset jobs.
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'pending', worker = NULL, "
+                "claimed_at = NULL, lease_expires = NULL WHERE status = 'failed'"
+            )
+            return cursor.rowcount
+
+    def status(self):
+        """
+        Get overview of all jobs
+
+        Returns pandas dataframe with one row per job
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, inputfile, parameters, input_hash, status, worker, "
+                "returncode, runtime, cpu_time, max_rss, output_dir "
+                "FROM jobs ORDER BY id"
+            ).fetchall()
+
+        return pd.DataFrame([dict(row) for row in rows])
+
+    def work(self, executable="feap", max_jobs=None, **run_options):
+        """
+        Claim and run jobs until the queue is empty or max_jobs are done
+
+        Every job is computed in its own directory job_<id> below output_root.
+        Additional keyword arguments (e.g. cpus, threads, memory_limit) are
+        passed to FEAPy.run. If FEAP cannot be started, the job is marked as
+        failed and the error is raised. Returns number of jobs computed by this
+        worker.
+        """
+        num_jobs = 0
+        while max_jobs is None or num_jobs < max_jobs:
+            job = self.claim()
+            if job is None:
+                break
+
+            output_dir = os.path.join(self.output_root, f"job_{job['id']:06d}")
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, job["inputfile"]), "w") as f:
+                f.write(job["input_text"])
+
+            cpu_time = None
+            max_rss = None
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(job["id"], stop), daemon=True
+            )
+            heartbeat.start()
+            start = time.perf_counter()
+            try:
+                runner = FEAPy(executable=executable, working_dir=output_dir)
+                res = runner.run(job["inputfile"], **run_options)
+            except Exception:
+                # Never leave a job in running state if FEAP could not be started
+                runtime = time.perf_counter() - start
+                self.complete(job["id"], -1, runtime, output_dir)
+                raise
+            finally:
+                stop.set()
+                heartbeat.join()
+            runtime = time.perf_counter() - start
+            cpu_time = (
+                res.resource_usage["user_time"] + res.resource_usage["system_time"]
+            )
+            max_rss = res.resource_usage["max_rss"]
+
+            self.complete(
+                job["id"], res.returncode, runtime, output_dir, cpu_time, max_rss
+            )
+            num_jobs += 1
+
+        return num_jobs
+
+    def run_parallel(
+        self,
+        n_jobs=-1,
+        executable="feap",
+        recover=True,
+        cores_per_job=None,
+        **run_options,
+    ):
+        """
+        Work on the queue with several local worker processes
+
+        If recover is set, running jobs of crashed workers are reset first. If
+        cores_per_job is set, every worker is pinned to its own set of cores of
+        the available ones and FEAP runs with as many threads.
+        Returns number of jobs computed by each worker.
+        """
+        if recover:
+            self.recover()
+
+        if n_jobs < 0:
+            n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+
+        options = [dict(run_options) for _ in range(n_jobs)]
+        if cores_per_job:
+            cores = sorted(os.sched_getaffinity(0))
+            if n_jobs * cores_per_job > len(cores):
+                raise RuntimeError(
+                    f"{n_jobs} jobs with {cores_per_job} cores each exceed the "
+                    f"{len(cores)} available cores."
+                )
+            for i, worker_options in enumerate(options):
+                worker_options["cpus"] = set(
+                    cores[i * cores_per_job : (i + 1) * cores_per_job]
+                )
+
+        return Parallel(n_jobs=n_jobs)(
+            delayed(self.work)(executable, **worker_options)
+            for worker_options in options
+        )
+
+
+class _Connection:
+    """
+    Context manager wrapping a single exclusive SQLite transaction
+    """
+
+    def __init__(self, database, timeout):
+        self.connection = sqlite3.connect(
+            database, timeout=timeout, isolation_level=None
+        )
+        self.connection.row_factory = sqlite3.Row
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
+        self.connection.close()
+        return False
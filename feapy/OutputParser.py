@@ -0,0 +1,266 @@
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+
+_NUMBER = r"([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+|[-+]\d+)?)"
+
+_STEP = re.compile(rf"Computing\s+solution\s+at\s+time\s+{_NUMBER}", re.IGNORECASE)
+_RESIDUAL = re.compile(
+    rf"Residual\s+norm\s*=\s*{_NUMBER}(?:\s+{_NUMBER})?",
+    re.IGNORECASE,
+)
+_ENERGY = re.compile(
+    rf"Maximum\s*=\s*{_NUMBER}\s+Current\s*=\s*{_NUMBER}"
+    rf"(?:\s+Tolerance\s*=\s*{_NUMBER})?",
+    re.IGNORECASE,
+)
+# FEAP writes the tolerance of the energy test in a separate line
+_TOLERANCE = re.compile(rf"^\s*Tolerance\s*=\s*{_NUMBER}", re.IGNORECASE)
+_NO_CONVERGENCE = re.compile(r"No\s+Convergence", re.IGNORECASE)
+_WARNING = re.compile(r"\*(WARNING|ERROR)\*", re.IGNORECASE)
+
+_COLUMNS = {
+    "step": np.int32,
+    "time": np.float64,
+    "dt": np.float64,
+    "iterations": np.int32,
+    "residual": np.float64,
+    "residual_ratio": np.float64,
+    "energy": np.float64,
+    "energy_max": np.float64,
+    "converged": "boolean",
+    "warnings": np.int32,
+}
+
+
+def _to_float(string):
+    """
+    Convert FEAP number to float
+
+    Handles Fortran exponents (1.0D+00) and the missing exponent character
+    of FEAP output (e.g. 6.89234-310 instead of 6.89234E-310).
+    """
+    string = string.replace("D", "E").replace("d", "e")
+    try:
+        return float(string)
+    except ValueError:
+        return float(re.sub(r"(\d)([-+]\d+)$", r"\1E\2", string))
+
+
+class OutputParser:
+    """
+    Line oriented parser for FEAP O-files and feap_out
+
+    Collects time, number of iterations, residual and energy norms, the
+    convergence flag and the number of warnings for every time step without
+    keeping the file in memory. Steps without energy convergence test or
+    convergence warning are stored with unknown (NA) convergence. The time
+    increment dt is the difference to the time of the previous step.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.warnings = []
+        self._position = 0
+        self._buffer = b""
+        self._current = None
+        self._num_steps = 0
+        self._time = 0.0
+
+    def read(self, dataframe=True):
+        """
+        Parse complete file
+
+        Returns pandas dataframe with one row per time step
+        """
+        self.reset()
+        records = []
+        with open(self.path, "r", errors="replace") as f:
+            for line in f:
+                record = self.feed(line)
+                if record:
+                    records.append(record)
+        record = self.finish()
+        if record:
+            records.append(record)
+
+        return self._to_table(records, dataframe)
+
+    def follow(self, poll_interval=1.0, timeout=None):
+        """
+        Follow a growing file and yield every completed time step
+
+        Stops if the file did not grow for timeout seconds. The last time step
+        is yielded when following stops. If the file is truncated, e.g. by a
+        new run writing to feap_out, parsing restarts at its beginning.
+        """
+        self.reset()
+        last_change = time.monotonic()
+        while True:
+            position = self._position
+            for record in self.poll():
+                yield record
+
+            if self._position != position:
+                last_change = time.monotonic()
+            if timeout is not None and time.monotonic() - last_change > timeout:
+                break
+            time.sleep(poll_interval)
+
+        record = self.finish()
+        if record:
+            yield record
+
+    def poll(self):
+        """
+        Parse all lines appended to the file since the last call
+
+        Resets the parser if the file has been truncated. Returns list of
+        completed time steps.
+        """
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        if os.path.getsize(self.path) < self._position:
+            self.reset()
+
+        with open(self.path, "rb") as f:
+            f.seek(self._position)
+            for line in iter(f.readline, b""):
+                # Keep incomplete last line for next poll
+                if not line.endswith(b"\n"):
+                    self._buffer += line
+                    break
+                record = self.feed((self._buffer + line).decode(errors="replace"))
+                self._buffer = b""
+                if record:
+                    records.append(record)
+            self._position = f.tell()
+
+        return records
+
+    def reset(self):
+        """
+        Reset parser state to the beginning of the file
+        """
+        self.warnings = []
+        self._position = 0
+        self._buffer = b""
+        self._current = None
+        self._num_steps = 0
+        self._time = 0.0
+
+    def feed(self, line):
+        """
+        Parse single line
+
+        Returns the previous time step if the line starts a new one
+        """
+        match = _STEP.search(line)
+        if match:
+            record = self.finish()
+            self._num_steps += 1
+            step_time = _to_float(match.group(1))
+            self._current = {
+                "step": self._num_steps,
+                "time": step_time,
+                "dt": step_time - self._time,
+                "iterations": 0,
+                "residual": np.nan,
+                "residual_ratio": np.nan,
+                "energy": np.nan,
+                "energy_max": np.nan,
+                "converged": None,
+                "warnings": 0,
+            }
+            self._time = step_time
+            return record
+
+        if self._current is None:
+            if _WARNING.search(line):
+                self.warnings.append((0, line.strip()))
+            return None
+
+        match = _RESIDUAL.search(line)
+        if match:
+            self._current["iterations"] += 1
+            self._current["residual"] = _to_float(match.group(1))
+            if match.group(2):
+                self._current["residual_ratio"] = _to_float(match.group(2))
+            return None
+
+        match = _ENERGY.search(line)
+        if match:
+            self._current["energy_max"] = _to_float(match.group(1))
+            self._current["energy"] = _to_float(match.group(2))
+            if match.group(3):
+                self._set_energy_convergence(_to_float(match.group(3)))
+            return None
+
+        match = _TOLERANCE.search(line)
+        if match:
+            self._set_energy_convergence(_to_float(match.group(1)))
+            return None
+
+        if _NO_CONVERGENCE.search(line):
+            self._current["converged"] = False
+        if _WARNING.search(line):
+            self._current["warnings"] += 1
+            self.warnings.append((self._current["step"], line.strip()))
+
+        return None
+
+    def _set_energy_convergence(self, tolerance):
+        """
+        Evaluate energy convergence test of current time step
+        """
+        energy = self._current["energy"]
+        maximum = self._current["energy_max"]
+        if not np.isnan(energy):
+            self._current["converged"] = energy <= tolerance * maximum
+
+    def finish(self):
+        """
+        Close current time step
+
+        Returns the time step or None if no step has been started
+        """
+        record = self._current
+        self._current = None
+        return record
+
+    def _to_table(self, records, dataframe):
+        """
+        Convert list of time steps to compactly typed columns
+        """
+        columns = {}
+        for key, dtype in _COLUMNS.items():
+            values = [record[key] for record in records]
+            if dtype == "boolean":
+                columns[key] = pd.array(values, dtype=dtype)
+            else:
+                columns[key] = np.array(values, dtype=dtype)
+        if dataframe:
+            return pd.DataFrame(columns)
+        return columns
+
+
+def flag_slow_convergence(
+    data, max_iterations=10, max_residual_ratio=None, flag_unknown=False
+):
+    """
+    Flag time steps that converged slowly or not at all
+
+    Steps with unknown convergence are only flagged if flag_unknown is set.
+
+    Returns boolean pandas series aligned with data
+    """
+    converged = pd.Series(data["converged"], dtype="boolean")
+    flags = ~converged.fillna(not flag_unknown).astype(bool)
+    flags |= data["iterations"] > max_iterations
+    if max_residual_ratio is not None:
+        flags |= data["residual_ratio"] > max_residual_ratio
+    return flags
@@ -1,7 +1,8 @@
 import pandas as pd
 import meshio
 import numpy as np
-from .Common import get_files_by_extension
+from .Common import get_vtu_files
+from .Probe import Probe
 
 
 class Postprocessor:
@@ -9,7 +10,7 @@ class Postprocessor:
         self.workin_directory = working_directory
 
     def get_volume(self, deformed=True, dataframe=True, normalize=True):
-        vtu_files = get_files_by_extension(self.workin_directory, "vtu")
+        vtu_files = get_vtu_files(self.workin_directory)
         vol = []
         timestep = []
 
@@ -28,6 +29,22 @@ class Postprocessor:
 
         return vol, timestep
 
+    def get_probe(self, points, method="interpolate"):
+        """
+        Create probe for sampling fields at points over all timesteps
+
+        Returns Probe object with cached cell lookups and interpolation weights
+        """
+        return Probe(self.workin_directory, points, method=method)
+
+    def get_line_probe(self, start, end, num_points, method="interpolate"):
+        """
+        Create probe for sampling fields along a line over all timesteps
+        """
+        return Probe.along_line(
+            self.workin_directory, start, end, num_points, method=method
+        )
+
     def _volume(self, mesh_data, deformed):
         """
         Compute volume for overall mesh
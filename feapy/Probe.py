@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+from .Common import get_vtu_files
+from .VTUFile import VTUFile
+
+
+def _hexahedron(xi):
+    """
+    Trilinear shape functions and derivatives for VTK_HEXAHEDRON
+    """
+    corners = np.array(
+        [
+            [-1, -1, -1],
+            [1, -1, -1],
+            [1, 1, -1],
+            [-1, 1, -1],
+            [-1, -1, 1],
+            [1, -1, 1],
+            [1, 1, 1],
+            [-1, 1, 1],
+        ],
+        dtype=np.float64,
+    )
+    terms = 1.0 + corners * xi
+    shape = np.prod(terms, axis=1) / 8.0
+    derivatives = np.zeros((8, 3))
+    derivatives[:, 0] = corners[:, 0] * terms[:, 1] * terms[:, 2] / 8.0
+    derivatives[:, 1] = corners[:, 1] * terms[:, 0] * terms[:, 2] / 8.0
+    derivatives[:, 2] = corners[:, 2] * terms[:, 0] * terms[:, 1] / 8.0
+    return shape, derivatives
+
+
+def _quad(xi):
+    """
+    Bilinear shape functions and derivatives for VTK_QUAD
+    """
+    corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=np.float64)
+    terms = 1.0 + corners * xi
+    shape = np.prod(terms, axis=1) / 4.0
+    derivatives = np.zeros((4, 2))
+    derivatives[:, 0] = corners[:, 0] * terms[:, 1] / 4.0
+    derivatives[:, 1] = corners[:, 1] * terms[:, 0] / 4.0
+    return shape, derivatives
+
+
+def _tetra(xi):
+    """
+    Linear shape functions and derivatives for VTK_TETRA
+    """
+    shape = np.array([1.0 - xi.sum(), xi[0], xi[1], xi[2]])
+    derivatives = np.vstack([-np.ones(3), np.eye(3)])
+    return shape, derivatives
+
+
+def _triangle(xi):
+    """
+    Linear shape functions and derivatives for VTK_TRIANGLE
+    """
+    shape = np.array([1.0 - xi.sum(), xi[0], xi[1]])
+    derivatives = np.vstack([-np.ones(2), np.eye(2)])
+    return shape, derivatives
+
+
+# VTK cell type -> (shape function routine, parametric dimension, start value, simplex)
+_CELL_TYPES = {
+    5: (_triangle, 2, np.full(2, 1.0 / 3.0), True),
+    9: (_quad, 2, np.zeros(2), False),
+    10: (_tetra, 3, np.full(3, 0.25), True),
+    12: (_hexahedron, 3, np.zeros(3), False),
+}
+
+
+class Probe:
+    """
+    Sample point and cell data of all vtu files of a run at fixed locations
+
+    The cell search and the interpolation weights are computed once on the
+    reference configuration of the first vtu file. Every timestep afterwards
+    only gathers the values of the probed entities.
+    """
+
+    def __init__(
+        self, working_directory, points, method="interpolate", tolerance=1e-8
+    ):
+        self.working_directory = working_directory
+        self.method = method
+        self.tolerance = tolerance
+        self.points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        self.vtu_files = get_vtu_files(self.working_directory)
+        if not self.vtu_files:
+            raise RuntimeError(f"No vtu files found in {self.working_directory}.")
+
+        reference = VTUFile(self.vtu_files[0].path)
+        self.mesh_points = reference.get_Points()
+        self.connectivity, self.offsets, self.types = reference.get_Cells()
+        self.starts = np.concatenate(([0], self.offsets[:-1]))
+
+        if self.points.shape[1] < self.mesh_points.shape[1]:
+            padding = self.mesh_points.shape[1] - self.points.shape[1]
+            self.points = np.pad(self.points, ((0, 0), (0, padding)))
+
+        if self.method == "interpolate":
+            self.node_ids, self.weights, self.cell_ids = self._locate_cells()
+        elif self.method == "nearest":
+            self.node_ids, self.weights, self.cell_ids = self._locate_nodes()
+        else:
+            raise RuntimeError(f"Unknown probing method {self.method}.")
+
+    @classmethod
+    def along_line(
+        cls, working_directory, start, end, num_points, method="interpolate"
+    ):
+        """
+        Create probe with equally spaced points on a line from start to end
+        """
+        points = np.linspace(
+            np.asarray(start, dtype=np.float64),
+            np.asarray(end, dtype=np.float64),
+            num_points,
+        )
+        return cls(working_directory, points, method=method)
+
+    def sample(self, field, location="PointData", dataframe=True):
+        """
+        Sample field at all probe points over all timesteps
+
+        Returns pandas dataframe with one row per timestep and probe point
+        """
+        timesteps = []
+        values = []
+        for file in self.vtu_files:
+            dataset = VTUFile(file.path).get_field(field, location)
+            values.append(self.gather(dataset, location))
+            timesteps.append(file.id)
+
+        values = np.stack(values)
+        if not dataframe:
+            return values, timesteps
+
+        num_probes, num_components = values.shape[1:]
+        data = {
+            "timestep": np.repeat(timesteps, num_probes),
+            "probe": np.tile(np.arange(num_probes), len(timesteps)),
+        }
+        for i in range(self.points.shape[1]):
+            data[f"x{i}"] = np.tile(self.points[:, i], len(timesteps))
+        if num_components == 1:
+            data[field] = values[:, :, 0].ravel()
+        else:
+            for i in range(num_components):
+                data[f"{field}_{i}"] = values[:, :, i].ravel()
+
+        return pd.DataFrame(data)
+
+    def gather(self, dataset, location="PointData"):
+        """
+        Evaluate a single dataset at all probe points using the cached weights
+        """
+        num_components = dataset["NumberOfComponents"]
+        data = dataset["Data"].reshape(-1, num_components)
+
+        if location == "PointData":
+            return np.einsum("pk,pkc->pc", self.weights, data[self.node_ids])
+        elif location == "CellData":
+            unassigned = np.nonzero(self.cell_ids < 0)[0].tolist()
+            if unassigned:
+                raise RuntimeError(
+                    f"Nearest node of probe points {unassigned} does not belong "
+                    "to any cell."
+                )
+            return data[self.cell_ids]
+        raise RuntimeError(f"Unknown data location {location}.")
+
+    def _locate_nodes(self):
+        """
+        Find nearest mesh node and one of its adjacent cells for every probe
+        """
+        node_ids = np.zeros((len(self.points), 1), dtype=np.int64)
+        for i, point in enumerate(self.points):
+            distances = np.sum((self.mesh_points - point) ** 2, axis=1)
+            node_ids[i, 0] = np.argmin(distances)
+
+        # Map every node to the first cell referencing it
+        node_to_cell = np.full(len(self.mesh_points), -1, dtype=np.int64)
+        cell_of_entry = np.repeat(
+            np.arange(len(self.offsets)), self.offsets - self.starts
+        )
+        node_to_cell[self.connectivity[::-1]] = cell_of_entry[::-1]
+
+        weights = np.ones((len(self.points), 1))
+        return node_ids, weights, node_to_cell[node_ids[:, 0]]
+
+    def _locate_cells(self):
+        """
+        Find the cell containing every probe and its interpolation weights
+        """
+        num_probes = len(self.points)
+        max_nodes = int(np.max(self.offsets - self.starts))
+        node_ids = np.zeros((num_probes, max_nodes), dtype=np.int64)
+        weights = np.zeros((num_probes, max_nodes))
+        cell_ids = np.zeros(num_probes, dtype=np.int64)
+
+        # Bounding boxes of all cells for a vectorized coarse search
+        lower = np.minimum.reduceat(self.mesh_points[self.connectivity], self.starts)
+        upper = np.maximum.reduceat(self.mesh_points[self.connectivity], self.starts)
+        margin = self.tolerance * np.max(upper - lower)
+
+        for i, point in enumerate(self.points):
+            candidates = np.nonzero(
+                np.all((point >= lower - margin) & (point <= upper + margin), axis=1)
+            )[0]
+            for cell in candidates:
+                shape = self._natural_weights(cell, point)
+                if shape is not None:
+                    nodes = self.connectivity[self.starts[cell] : self.offsets[cell]]
+                    node_ids[i, : len(nodes)] = nodes
+                    weights[i, : len(nodes)] = shape
+                    cell_ids[i] = cell
+                    break
+            else:
+                raise RuntimeError(f"Probe point {point} is not located in the mesh.")
+
+        return node_ids, weights, cell_ids
+
+    def _natural_weights(self, cell, point, max_iterations=20):
+        """
+        Compute shape function values at point if it lies within cell
+
+        Returns None if the point is outside of the cell.
+        """
+        cell_type = int(self.types[cell])
+        if cell_type not in _CELL_TYPES:
+            raise RuntimeError(
+                f"Probing not implemented for VTK cell type {cell_type}."
+            )
+        shape_functions, dim, xi, simplex = _CELL_TYPES[cell_type]
+
+        nodes = self.connectivity[self.starts[cell] : self.offsets[cell]]
+        coordinates = self.mesh_points[nodes, :dim]
+        target = point[:dim]
+
+        xi = xi.copy()
+        for _ in range(max_iterations):
+            shape, derivatives = shape_functions(xi)
+            residual = target - shape @ coordinates
+            jacobian = coordinates.T @ derivatives
+            try:
+                increment = np.linalg.solve(jacobian, residual)
+            except np.linalg.LinAlgError:
+                return None
+            xi += increment
+            if np.linalg.norm(increment) < self.tolerance:
+                break
+
+        shape, _ = shape_functions(xi)
+        if simplex:
+            inside = np.all(shape >= -self.tolerance)
+        else:
+            inside = np.all(np.abs(xi) <= 1.0 + self.tolerance)
+
+        return shape if inside else None
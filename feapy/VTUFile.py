@@ -23,6 +23,33 @@ class VTUFile:
         raw_cell_data = self.root.findall("*/*/CellData/DataArray")
         return self.extract_data(raw_cell_data)
 
+    def get_Points(self):
+        """
+        Get reference coordinates of all points as (NumberOfPoints, 3) array
+        """
+        raw_points = self.root.findall("*/*/Points/DataArray")[0]
+        return self.convert_data_to_np(raw_points).reshape(self.number_of_points, -1)
+
+    def get_Cells(self):
+        """
+        Get cell connectivity, offsets and types as integer arrays
+        """
+        cells = {}
+        for element in self.root.findall("*/*/Cells/DataArray"):
+            cells[element.get("Name")] = self.convert_data_to_np(element).astype(
+                np.int64
+            )
+        return cells["connectivity"], cells["offsets"], cells["types"]
+
+    def get_field(self, name, location="PointData"):
+        """
+        Get a single data array by name without converting all other arrays
+        """
+        for element in self.root.findall(f"*/*/{location}/DataArray"):
+            if element.get("Name") == name:
+                return self.extract_data([element])[name]
+        raise RuntimeError(f"{name} not found in {location}.")
+
     def extract_data(self, raw_data):
         data = {}
         for element in raw_data:
@@ -0,0 +1,220 @@
+import numpy as np
+
+
+# Faces of 3D VTK cells in local node numbering (outward normals)
+_CELL_FACES = {
+    10: ([[0, 2, 1], [0, 1, 3], [1, 2, 3], [0, 3, 2]], 5),
+    12: (
+        [
+            [0, 3, 2, 1],
+            [4, 5, 6, 7],
+            [0, 1, 5, 4],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [3, 0, 4, 7],
+        ],
+        9,
+    ),
+}
+
+# VTK cell types that are not reduced when extracting the surface
+_SURFACE_TYPES = {1, 3, 5, 9}
+
+
+def filter_pattern(pattern, fields):
+    """
+    Reduce refactoring pattern to the selected fields
+
+    Eigenvalue fields (<name>_EVal) keep their base field in the pattern.
+    """
+    if fields is None:
+        return pattern
+
+    filtered = {}
+    for key in pattern:
+        sub_pattern = {
+            new_key: pattern[key][new_key]
+            for new_key in pattern[key]
+            if new_key in fields or f"{new_key}_EVal" in fields
+        }
+        if sub_pattern:
+            filtered[key] = sub_pattern
+
+    return filtered
+
+
+def select_timesteps(ids, stride=1, timesteps=None):
+    """
+    Select timestep ids for preview export
+
+    Takes every stride-th id or, if timesteps is given, the available ids
+    closest to the requested ones. Returns sorted list of ids.
+    """
+    if stride < 1:
+        raise RuntimeError("stride must be at least 1.")
+
+    ids = sorted(ids)
+    if not ids:
+        return ids
+
+    if timesteps is not None:
+        available = np.asarray(ids)
+        selected = {
+            ids[int(np.argmin(np.abs(available - timestep)))] for timestep in timesteps
+        }
+        return sorted(selected)
+
+    return ids[::stride]
+
+
+class VTUPreview:
+    """
+    Reduce vtu file to a compact preview
+
+    Drops all data arrays not contained in fields, optionally extracts the
+    surface of 3D meshes with every cell_stride-th face and writes floating
+    point data as Float32.
+    """
+
+    def __init__(
+        self, vtufile, fields=None, float32=True, surface=False, cell_stride=1
+    ):
+        if cell_stride < 1:
+            raise RuntimeError("cell_stride must be at least 1.")
+
+        self.vtu_file = vtufile
+        self.fields = fields
+        self.float32 = float32
+        self.surface = surface
+        self.cell_stride = cell_stride
+
+    def apply(self):
+        for piece in self.vtu_file.root.findall("*/Piece"):
+            if self.fields is not None:
+                self.select_fields(piece)
+            if self.surface or self.cell_stride > 1:
+                self.extract_surface(piece)
+            if self.float32:
+                self.downcast(piece)
+
+        pieces = self.vtu_file.root.findall("*/Piece")
+        self.vtu_file.number_of_points = int(pieces[0].get("NumberOfPoints"))
+        self.vtu_file.number_of_cells = int(pieces[0].get("NumberOfCells"))
+
+    def select_fields(self, piece):
+        """
+        Remove all PointData and CellData arrays not contained in fields
+        """
+        for parent in piece.findall("PointData") + piece.findall("CellData"):
+            parent[:] = [
+                element
+                for element in parent
+                if element.tag != "DataArray" or element.get("Name") in self.fields
+            ]
+
+    def downcast(self, piece):
+        """
+        Convert all Float64 arrays of piece to Float32
+        """
+        for element in piece.iter("DataArray"):
+            if element.get("type") == "Float64":
+                data = self.vtu_file.convert_data_to_np(element)
+                self.write_array(element, data, "Float32")
+
+    def write_array(self, element, data, data_type):
+        """
+        Write data into DataArray element in ascii format
+        """
+        if data_type == "Float32":
+            data = data.astype(np.float32)
+        element.set("type", data_type)
+        element.set("format", "ascii")
+        element.text = " ".join(map(str, data))
+
+    def extract_surface(self, piece):
+        """
+        Replace cells of piece by boundary faces and drop unused points
+
+        Faces are boundary faces if they belong to a single cell only. 2D cells
+        are kept as they are. Point data is reduced to the used points, cell
+        data is taken from the cell each face belongs to.
+        """
+        cells = {}
+        for element in piece.findall("Cells/DataArray"):
+            cells[element.get("Name")] = element
+        connectivity = self.vtu_file.convert_data_to_np(
+            cells["connectivity"]
+        ).astype(np.int64)
+        offsets = self.vtu_file.convert_data_to_np(cells["offsets"]).astype(np.int64)
+        types = self.vtu_file.convert_data_to_np(cells["types"]).astype(np.int64)
+        starts = np.concatenate(([0], offsets[:-1]))
+
+        faces, parents, face_types = [], [], []
+        for cell_type in np.unique(types):
+            cell_ids = np.nonzero(types == cell_type)[0]
+            num_nodes = int(offsets[cell_ids[0]] - starts[cell_ids[0]])
+            nodes = connectivity[starts[cell_ids][:, None] + np.arange(num_nodes)]
+
+            if cell_type in _SURFACE_TYPES or not self.surface:
+                faces.extend(nodes)
+                parents.extend(cell_ids)
+                face_types.extend([cell_type] * len(cell_ids))
+                continue
+            if cell_type not in _CELL_FACES:
+                raise RuntimeError(
+                    "Surface extraction not implemented for VTK cell type "
+                    f"{cell_type}."
+                )
+
+            local_faces, face_type = _CELL_FACES[cell_type]
+            local_faces = np.asarray(local_faces)
+            all_faces = nodes[:, local_faces].reshape(-1, local_faces.shape[1])
+            all_parents = np.repeat(cell_ids, len(local_faces))
+
+            _, index, counts = np.unique(
+                np.sort(all_faces, axis=1),
+                axis=0,
+                return_index=True,
+                return_counts=True,
+            )
+            boundary = np.sort(index[counts == 1])
+            faces.extend(all_faces[boundary])
+            parents.extend(all_parents[boundary])
+            face_types.extend([face_type] * len(boundary))
+
+        faces = faces[:: self.cell_stride]
+        parents = np.asarray(parents[:: self.cell_stride], dtype=np.int64)
+        face_types = face_types[:: self.cell_stride]
+
+        # Renumber used points
+        used_points = np.unique(np.concatenate(faces)) if faces else np.zeros(0, int)
+        new_connectivity = [np.searchsorted(used_points, face) for face in faces]
+        new_offsets = np.cumsum([len(face) for face in faces])
+
+        num_points = int(piece.get("NumberOfPoints"))
+        num_cells = int(piece.get("NumberOfCells"))
+        for element in piece.findall("Points/DataArray") + piece.findall(
+            "PointData/DataArray"
+        ):
+            self.subset_array(element, num_points, used_points)
+        for element in piece.findall("CellData/DataArray"):
+            self.subset_array(element, num_cells, parents)
+
+        cells["connectivity"].text = " ".join(
+            map(str, np.concatenate(new_connectivity) if faces else [])
+        )
+        cells["offsets"].text = " ".join(map(str, new_offsets))
+        cells["types"].text = " ".join(map(str, face_types))
+        piece.set("NumberOfPoints", str(len(used_points)))
+        piece.set("NumberOfCells", str(len(faces)))
+
+    def subset_array(self, element, num_entities, entity_ids):
+        """
+        Reduce DataArray to the given entities
+        """
+        data = self.vtu_file.convert_data_to_np(element).reshape(num_entities, -1)
+        data = data[entity_ids].ravel()
+        data_type = element.get("type")
+        if not data_type.startswith("Float"):
+            data = data.astype(np.int64)
+        self.write_array(element, data, data_type)
@@ -4,54 +4,85 @@ import xml.etree.ElementTree as ElementTree
 
 
 class VTURefactorer:
-    def __init__(self, vtufile, refactoring_pattern):
+    def __init__(self, vtufile, refactoring_pattern, float32=False):
         self.vtu_file = vtufile
         self.pattern = refactoring_pattern
+        self.float32 = float32
 
     def refactor(self):
-        # Refactor data
-        refactored_data = {}
-        point_data = self.vtu_file.get_PointData()
+        pieces = self.vtu_file.root.findall("*/Piece")
+
+        # Check pattern before modifying the tree
+        names = set()
+        for piece in pieces:
+            for element in piece.findall("PointData/DataArray"):
+                names.add(element.get("Name"))
+            for element in piece.findall("CellData/DataArray"):
+                names.add(element.get("Name"))
         for key in self.pattern:
-            if key in point_data:
-                refactored_data[key] = self.refactor_by_pattern(
-                    point_data[key],
-                    self.vtu_file.number_of_points,
-                    self.pattern[key],
+            if key not in names:
+                raise RuntimeError(
+                    "{} not found in PointData or CellData.".format(key)
                 )
-            else:
-                raise RuntimeError("{} not found in PointData.".format(key))
 
-        # Add refactored data to tree
-        for key in self.pattern:
-            for new_key in refactored_data[key]:
-                parent = self.vtu_file.root.findall("*/*/PointData")
-                child = ElementTree.SubElement(parent[0], "DataArray")
-                child.set("type", "Float64")
+        # Refactor data of every piece
+        for piece in pieces:
+            num_points = int(piece.get("NumberOfPoints").strip())
+            num_cells = int(piece.get("NumberOfCells").strip())
+            for parent in piece.findall("PointData"):
+                self.refactor_section(parent, num_points)
+            for parent in piece.findall("CellData"):
+                self.refactor_section(parent, num_cells)
+
+    def refactor_section(self, parent, num_entities):
+        """
+        Replace refactored arrays of a single PointData or CellData section
+
+        All children are visited once. Arrays not contained in the pattern are
+        kept in place, refactored arrays are appended at the end.
+        """
+        kept = []
+        added = []
+        for element in parent:
+            key = element.get("Name")
+            if element.tag != "DataArray" or key not in self.pattern:
+                kept.append(element)
+                continue
+
+            dataset = {
+                "NumberOfComponents": int(element.get("NumberOfComponents")),
+                "Data": self.vtu_file.convert_data_to_np(element),
+            }
+            refactored_data = self.refactor_by_pattern(
+                dataset, num_entities, self.pattern[key]
+            )
+            for new_key in refactored_data:
+                data = refactored_data[new_key]["Data"]
+                child = ElementTree.Element("DataArray")
+                if self.float32:
+                    data = data.astype(np.float32)
+                    child.set("type", "Float32")
+                else:
+                    child.set("type", "Float64")
                 child.set("Name", new_key)
                 child.set(
                     "NumberOfComponents",
-                    str(refactored_data[key][new_key]["NumberOfComponents"]),
+                    str(refactored_data[new_key]["NumberOfComponents"]),
                 )
                 child.set("format", "ascii")
-                child.text = " ".join(map(str, refactored_data[key][new_key]["Data"]))
+                child.text = " ".join(map(str, data))
+                added.append(child)
 
-        # Remove refactored fields
-        for key in self.pattern:
-            for parent in self.vtu_file.root.findall("*/*/PointData"):
-                for element in parent.findall("DataArray"):
-                    if element.get("Name") == key:
-                        parent.remove(element)
+        if added:
+            parent[:] = kept + added
 
     def reshape_data(self, dataset, num_entities):
         num_components = dataset["NumberOfComponents"]
         raw_data = dataset["Data"]
-        data = np.ndarray(shape=(num_entities, num_components))
-
-        for i in range(num_entities):
-            data[i, :] = raw_data[i * num_components : ((i + 1) * num_components)]
 
-        return data
+        return raw_data[: num_entities * num_components].reshape(
+            num_entities, num_components
+        )
 
     def refactor_by_pattern(self, dataset, num_entities, pattern):
         data = self.reshape_data(dataset, num_entities)
@@ -63,11 +94,8 @@ class VTURefactorer:
             refactored_data[key] = {}
             refactored_data[key]["NumberOfComponents"] = length
 
-            new_array = np.zeros(length * num_entities)
-            for i in range(num_entities):
-                entity_data = data[i, start : (start + length)]
-                new_array[i * length : (i + 1) * length] = entity_data
-                refactored_data[key]["Data"] = new_array
+            new_array = data[:, start : (start + length)].flatten()
+            refactored_data[key]["Data"] = new_array
 
             if pattern[key]["Eigenvalues"]:
                 ev_key = key + "_EVal"
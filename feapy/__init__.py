@@ -1,3 +1,7 @@
 from .Feapy import FEAPy
 from .Postprocessor import Postprocessor
 from .VTURefactorer import VTURefactorer
+from .Probe import Probe
+from .JobQueue import JobQueue
+from .OutputParser import OutputParser
+from .Compare import compare_runs
@@ -2,6 +2,7 @@ import argparse
 from pathlib import Path
 from .VTUFile import VTUFile
 from .VTURefactorer import VTURefactorer
+from .VTUPreview import VTUPreview, filter_pattern, select_timesteps
 import json
 from tqdm import tqdm
 from joblib import Parallel, delayed
@@ -41,18 +42,68 @@ def _create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Remove original vtu files. (Default: False)",
     )
+    parser.add_argument(
+        "-p",
+        "--preview",
+        action="store_true",
+        help="Write compact preview files (*_preview.vtu) using Float32. Implied by any of -f, -k, -t, -s and -c. (Default: False)",
+    )
+    parser.add_argument(
+        "-f",
+        "--fields",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Fields kept in preview files. (Default: All fields)",
+    )
+    parser.add_argument(
+        "-k",
+        "--every",
+        type=int,
+        default=1,
+        help="Only use every k-th timestep for preview files. (Default: 1)",
+    )
+    parser.add_argument(
+        "-t",
+        "--timesteps",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Only use the timesteps closest to the given ids for preview files.",
+    )
+    parser.add_argument(
+        "-s",
+        "--surface",
+        action="store_true",
+        help="Only keep the surface of the mesh in preview files. (Default: False)",
+    )
+    parser.add_argument(
+        "-c",
+        "--cell_stride",
+        type=int,
+        default=1,
+        help="Only keep every n-th cell in preview files. (Default: 1)",
+    )
 
     return parser
 
 
-def _refactor_vtu_file(vtu_file_path: Path, refactoring_pattern: dict):
+def _refactor_vtu_file(
+    vtu_file_path: Path, refactoring_pattern: dict, preview: dict = None
+):
     """
     Routine for refactoring of single vtu file
     """
     vtu_file = VTUFile(vtu_file_path.as_posix())
-    refactorer = VTURefactorer(vtu_file, refactoring_pattern)
+    refactorer = VTURefactorer(vtu_file, refactoring_pattern, float32=bool(preview))
     refactorer.refactor()
-    out_file_path = Path(vtu_file_path.parent) / f"{vtu_file_path.stem}_refactored.vtu"
+    if preview:
+        VTUPreview(vtu_file, **preview).apply()
+        out_file_path = Path(vtu_file_path.parent) / f"{vtu_file_path.stem}_preview.vtu"
+    else:
+        out_file_path = (
+            Path(vtu_file_path.parent) / f"{vtu_file_path.stem}_refactored.vtu"
+        )
     vtu_file.export_file(out_file_path.as_posix())
 
 
@@ -61,6 +112,20 @@ def main() -> None:
     # Set up command line argument parsing
     parser = _create_parser()
     args = parser.parse_args()
+    if args.every < 1 or args.cell_stride < 1:
+        parser.error("--every and --cell_stride must be at least 1.")
+
+    # Any preview option implies --preview
+    args.preview = (
+        args.preview
+        or args.fields is not None
+        or args.every > 1
+        or args.timesteps is not None
+        or args.surface
+        or args.cell_stride > 1
+    )
+    if args.preview and args.remove_originals:
+        parser.error("Original vtu files cannot be removed when writing previews.")
 
     # Get base path
     base_path = Path.cwd()
@@ -80,9 +145,23 @@ def main() -> None:
     if not vtu_files:
         raise FileNotFoundError("No vtu-files found in this directory.")
 
+    # Reduce timesteps and fields for preview files
+    preview = None
+    if args.preview:
+        preview = {
+            "fields": args.fields,
+            "float32": True,
+            "surface": args.surface,
+            "cell_stride": args.cell_stride,
+        }
+        refactoring_pattern = filter_pattern(refactoring_pattern, args.fields)
+        ids = {int(vtu_file.stem[-5:]): vtu_file for vtu_file in vtu_files}
+        selected = select_timesteps(ids, args.every, args.timesteps)
+        vtu_files = [ids[id] for id in selected]
+
     # Perform refactoring using parallel computing
     Parallel(n_jobs=args.jobs)(
-        delayed(_refactor_vtu_file)(vtu_file, refactoring_pattern)
+        delayed(_refactor_vtu_file)(vtu_file, refactoring_pattern, preview)
         for vtu_file in tqdm(
             vtu_files,
             desc="Refactoring files",
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from feapy.Compare import compare_runs
+
+
+def vtu_text(displacements):
+    """
+    Single tetrahedron per piece with one list of displacements per piece
+    """
+    pieces = ""
+    for values in displacements:
+        pieces += f"""<Piece NumberOfPoints="4" NumberOfCells="1">
+<Points><DataArray type="Float64" NumberOfComponents="3" format="ascii">
+0 0 0 1 0 0 0 1 0 0 0 1</DataArray></Points>
+<Cells><DataArray type="Int32" Name="connectivity" format="ascii">0 1 2 3</DataArray>
+<DataArray type="Int32" Name="offsets" format="ascii">4</DataArray>
+<DataArray type="UInt8" Name="types" format="ascii">10</DataArray></Cells>
+<PointData><DataArray type="Float64" Name="Displacements" NumberOfComponents="1"
+format="ascii">{" ".join(map(str, values))}</DataArray></PointData>
+</Piece>"""
+    return (
+        '<?xml version="1.0"?>\n<VTKFile type="UnstructuredGrid" version="0.1">'
+        f"<UnstructuredGrid>{pieces}</UnstructuredGrid></VTKFile>"
+    )
+
+
+class TestCompare(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir_a = os.path.join(self.tmp.name, "a")
+        self.dir_b = os.path.join(self.tmp.name, "b")
+        os.mkdir(self.dir_a)
+        os.mkdir(self.dir_b)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, directory, name, text):
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(text)
+
+    def test_tplot(self):
+        self.write(self.dir_a, "Pinputa.dis", "0.0  0.0\n1.0  1.0E-03\n")
+        self.write(self.dir_b, "Pinputa.dis", "0.0  0.0\n1.0  1.0E-03\n")
+        self.write(self.dir_a, "Pinputa.sum", "0.0  0.0\n1.0  2.0E+01\n")
+        self.write(self.dir_b, "Pinputa.sum", "0.0  0.0\n1.0  2.1E+01\n")
+        self.write(self.dir_a, "Pinputa.str", "0.0  0.0\n")
+
+        results = compare_runs(self.dir_a, self.dir_b).set_index("field")
+
+        self.assertEqual(set(results["location"]), {"TPLOT"})
+        self.assertTrue(results.loc["Pinputa.dis", "passed"])
+        self.assertFalse(results.loc["Pinputa.sum", "passed"])
+        self.assertEqual(results.loc["Pinputa.sum", "max_abs_error"], 1.0)
+        self.assertEqual(results.loc["Pinputa.sum", "entity"], 1)
+        self.assertEqual(results.loc["Pinputa.sum", "component"], 1)
+        # Series missing in one of the runs fail
+        self.assertFalse(results.loc["Pinputa.str", "passed"])
+        self.assertTrue(np.isinf(results.loc["Pinputa.str", "max_abs_error"]))
+
+    def test_multiple_pieces(self):
+        self.write(self.dir_a, "Pinput00001.vtu", vtu_text([[0, 1, 2, 3]] * 2))
+        self.write(
+            self.dir_b, "Pinput00001.vtu", vtu_text([[0, 1, 2, 3], [0, 1, 2.5, 3]])
+        )
+
+        results = compare_runs(self.dir_a, self.dir_b).set_index("piece")
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results.loc[0, "passed"])
+        self.assertFalse(results.loc[1, "passed"])
+        self.assertEqual(results.loc[1, "max_abs_error"], 0.5)
+        self.assertEqual(results.loc[1, "entity"], 2)
+        self.assertEqual(results.loc[1, "coordinates"], (0.0, 1.0, 0.0))
+
+        # Pieces missing in one of the runs fail
+        self.write(self.dir_b, "Pinput00001.vtu", vtu_text([[0, 1, 2, 3]]))
+        results = compare_runs(self.dir_a, self.dir_b).set_index("piece")
+        self.assertTrue(results.loc[0, "passed"])
+        self.assertEqual(results.loc[1, "location"], "VTU")
+        self.assertFalse(results.loc[1, "passed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import signal
+import stat
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import multiprocessing
+from feapy.Feapy import peak_memory
+from feapy.JobQueue import JobQueue
+
+
+STUB = """#!/bin/sh
+value=$(cat Iinput)
+echo "$value" >> {log}
+if [ "$value" = "E=sleep" ] && [ ! -f {marker} ]; then
+    touch {marker}
+    sleep 5
+fi
+if [ "$value" = "E=fail" ]; then
+    exit 3
+fi
+exit 0
+"""
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.log = os.path.join(self.dir, "runs.log")
+        self.marker = os.path.join(self.dir, "marker")
+
+        self.executable = os.path.join(self.dir, "feap")
+        with open(self.executable, "w") as f:
+            f.write(STUB.format(log=self.log, marker=self.marker))
+        os.chmod(self.executable, os.stat(self.executable).st_mode | stat.S_IEXEC)
+
+        with open(os.path.join(self.dir, "Iinput.jinja"), "w") as f:
+            f.write("E={{E}}")
+
+        self.queue = JobQueue(os.path.join(self.dir, "queue.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_log(self):
+        with open(self.log) as f:
+            return f.read().split()
+
+    def test_parallel_run(self):
+        values = list(range(10)) + ["fail"]
+        for value in values:
+            self.queue.add("Iinput", {"E": value}, self.dir)
+        # Identical parameter sets are only added once
+        self.queue.add("Iinput", {"E": 0}, self.dir)
+
+        done = self.queue.run_parallel(n_jobs=3, executable=self.executable)
+
+        # Every job is run exactly once
+        self.assertEqual(sum(done), len(values))
+        self.assertEqual(
+            sorted(self.read_log()), sorted(f"E={value}" for value in values)
+        )
+
+        status = self.queue.status().set_index("id")
+        self.assertEqual(len(status), len(values))
+        self.assertEqual((status["status"] == "done").sum(), len(values) - 1)
+        failed = status[status["status"] == "failed"]
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed["returncode"].iloc[0], 3)
+        self.assertTrue(failed["parameters"].iloc[0].endswith('"fail"}'))
+
+        # Finished jobs are not run again
+        self.assertEqual(
+            sum(self.queue.run_parallel(n_jobs=2, executable=self.executable)), 0
+        )
+
+    def test_resume_after_killed_worker(self):
+        for value in ["sleep", 1, 2]:
+            self.queue.add("Iinput", {"E": value}, self.dir)
+
+        worker = multiprocessing.Process(
+            target=self.queue.work, args=(self.executable,), kwargs={"max_jobs": 1}
+        )
+        worker.start()
+        while not os.path.exists(self.marker):
+            time.sleep(0.05)
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.join()
+
+        status = self.queue.status().set_index("id")
+        self.assertEqual(status.loc[1, "status"], "running")
+
+        self.queue.run_parallel(n_jobs=2, executable=self.executable)
+
+        status = self.queue.status()
+        self.assertTrue((status["status"] == "done").all())
+        self.assertEqual(self.read_log().count("E=sleep"), 2)
+        self.assertEqual(self.read_log().count("E=1"), 1)
+
+    def test_recover_jobs_of_other_hosts(self):
+        job_id = self.queue.add("Iinput", {"E": 1}, self.dir)
+        self.queue.claim()
+        with self.queue._connect() as connection:
+            connection.execute("UPDATE jobs SET worker = 'otherhost:1'")
+
+        # Jobs with valid lease are kept, independent of their runtime
+        self.assertEqual(self.queue.recover(), 0)
+        # Results of workers that do not own the job are discarded
+        self.assertFalse(self.queue.complete(job_id, 0, 1.0, self.dir))
+
+        with self.queue._connect() as connection:
+            connection.execute("UPDATE jobs SET lease_expires = 0")
+        self.assertEqual(self.queue.recover(), 1)
+        self.assertEqual(self.queue.status()["status"].iloc[0], "pending")
+
+    def test_heartbeat_survives_failed_renewal(self):
+        queue = JobQueue(os.path.join(self.dir, "queue.db"), lease=0.6)
+        job_id = queue.add("Iinput", {"E": 1}, self.dir)
+        queue.claim()
+
+        renew = queue.renew
+        calls = []
+
+        def flaky_renew(job_id):
+            calls.append(job_id)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            renew(job_id)
+
+        queue.renew = flaky_renew
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=queue._heartbeat, args=(job_id, stop))
+        heartbeat.start()
+        time.sleep(0.8)
+        stop.set()
+        heartbeat.join()
+
+        self.assertGreater(len(calls), 1)
+        with queue._connect() as connection:
+            lease_expires = connection.execute(
+                "SELECT lease_expires FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()[0]
+        self.assertGreater(lease_expires, time.time())
+
+    def test_limits_with_heartbeat(self):
+        self.queue.add("Iinput", {"E": 1}, self.dir)
+        cpus = set(list(os.sched_getaffinity(0))[:1])
+
+        done = self.queue.work(
+            self.executable, cpus=cpus, nice=1, memory_limit=2**30, cpu_time_limit=60
+        )
+
+        self.assertEqual(done, 1)
+        status = self.queue.status()
+        self.assertEqual(status["status"].iloc[0], "done")
+        # Memory of the worker process is not attributed to FEAP
+        self.assertLess(status["max_rss"].iloc[0], peak_memory(os.getpid()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from feapy.OutputParser import OutputParser, flag_slow_convergence
+
+
+# Excerpt of a FEAP O-file with a converged step, a step without convergence
+# and a step without energy convergence test
+OFILE = """
+   Computing solution at time  1.0000E-01: Total time step   =       1
+
+   Residual norm =     3.5355339E+01    1.0000000E+00    t=     0.02     0.00
+   Energy convergence test
+    Maximum   =  6.250000000000E+00 Current   =  6.250000000000E+00
+    Tolerance =  1.000000000000E-16
+   Residual norm =     2.1650635E-03    6.1237244E-05    t=     0.03     0.00
+   Energy convergence test
+    Maximum   =  6.250000000000E+00 Current   =  1.171875000000-309
+    Tolerance =  1.000000000000E-16
+
+   Computing solution at time  3.0000E-01: Total time step   =       2
+
+   Residual norm =     4.0000000D+01    1.0000000D+00    t=     0.04     0.00
+   Energy convergence test
+    Maximum   =  8.000000000000E+00 Current   =  8.000000000000E+00
+    Tolerance =  1.000000000000E-16
+   Residual norm =     4.0000000E+00    1.0000000E-01    t=     0.05     0.00
+   Energy convergence test
+    Maximum   =  8.000000000000E+00 Current   =  2.000000000000E-02
+    Tolerance =  1.000000000000E-16
+ *WARNING* No Convergence in    2 Iterations
+
+   Computing solution at time  4.0000E-01: Total time step   =       3
+
+   Residual norm =     1.0000000E+00    1.0000000E+00    t=     0.06     0.00
+"""
+
+
+class TestOutputParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "Oinput")
+        with open(self.path, "w") as f:
+            f.write(OFILE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read(self):
+        data = OutputParser(self.path).read()
+
+        self.assertEqual(list(data["step"]), [1, 2, 3])
+        np.testing.assert_allclose(data["time"], [0.1, 0.3, 0.4])
+        np.testing.assert_allclose(data["dt"], [0.1, 0.2, 0.1])
+        self.assertEqual(list(data["iterations"]), [2, 2, 1])
+        np.testing.assert_allclose(data["residual"], [2.1650635e-03, 4.0, 1.0])
+        np.testing.assert_allclose(data["residual_ratio"], [6.1237244e-05, 0.1, 1.0])
+        np.testing.assert_allclose(data["energy"][:2], [1.171875e-309, 2.0e-02])
+        self.assertTrue(np.isnan(data["energy"][2]))
+        self.assertEqual(list(data["warnings"]), [0, 1, 0])
+
+        self.assertTrue(data["converged"][0])
+        self.assertFalse(data["converged"][1])
+        self.assertTrue(pd.isna(data["converged"][2]))
+        self.assertEqual(list(flag_slow_convergence(data)), [False, True, False])
+
+    def test_poll_truncated_file(self):
+        parser = OutputParser(self.path)
+        self.assertEqual(len(parser.poll()), 2)
+
+        # A new run truncates the file and writes a shorter output
+        with open(self.path, "w") as f:
+            f.write(OFILE[: OFILE.index("   Residual norm =     4.0")])
+        records = parser.poll() + [parser.finish()]
+
+        self.assertEqual([record["step"] for record in records], [1, 2])
+        self.assertEqual(records[1]["time"], 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()